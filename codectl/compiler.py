@@ -1,22 +1,49 @@
 """Compiler module
 """
 
-import json
 import os
 import shutil
-import copy
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Tuple
+from typing import Iterator, List, Optional, Tuple
 import click
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, Template
 from codectl import utils
 from codectl import jinja
+from codectl import jsonio
 from codectl.schema import recursive_resolve
 
+def _ensure_dir(path: Path, created_dirs: Optional[set] = None):
+    """Create a directory and its parents, skipping directories recorded in
+    `created_dirs` by earlier calls.
+
+    Set membership tests and additions are atomic, so worker threads share the set
+    without a lock.
+    """
+    key = str(path)
+    if created_dirs is not None and key in created_dirs:
+        return
+    path.mkdir(parents=True, exist_ok=True)
+    if created_dirs is not None:
+        created_dirs.add(key)
+
+
+@lru_cache(maxsize=None)
+def _read_schema(schema_path: str, mtime_ns: int) -> dict:
+    """Read and parse a JSON schema file, cached by path and modification time.
+
+    The returned dictionary is shared between callers and must not be mutated.
+    """
+    return utils.intern_keys(jsonio.load_json(Path(schema_path)))
+
 
 def load_associated_schema(tmpl_path: Path) -> Tuple[dict, Path]:
     """Load the associated JSON schema for a given template file.
 
+    Schemas are parsed once per file and modification time, so templates rendered
+    many times do not re-read their schema. The returned dictionary must not be mutated.
+
     Args:
         tmpl_path (Path): The path to the template file.
 
@@ -24,8 +51,28 @@ def load_associated_schema(tmpl_path: Path) -> Tuple[dict, Path]:
         dict: A dictionary representing the loaded JSON schema.
     """
     schema_path = tmpl_path.with_suffix(".schema")
-    schema = json.loads(schema_path.read_text()) if schema_path.is_file() else {}
-    return schema, schema_path
+    try:
+        mtime_ns = schema_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {}, schema_path
+    return _read_schema(str(schema_path), mtime_ns), schema_path
+
+
+def merge_associated_schema(schemas: dict, tmpl_path: Path) -> dict:
+    """Merge the associated JSON schema of a template over the shared schemas.
+
+    Templates only update the top level of the schemas with their associated schema,
+    so a shallow copy is enough, and templates without one share `schemas` as is.
+
+    Args:
+        schemas (dict): The schemas shared by all templates of a directory.
+        tmpl_path (Path): The path to the template file.
+
+    Returns:
+        dict: The schemas to render the template with.
+    """
+    schema, schema_path = load_associated_schema(tmpl_path)
+    return {**schemas, **schema} if schema else schemas
 
 
 def get_output_dir(tmpl_path: Path, tmpl_root_dir: Path, output: Path) -> Path:
@@ -43,26 +90,143 @@ def get_output_dir(tmpl_path: Path, tmpl_root_dir: Path, output: Path) -> Path:
     return output / rel_path
 
 
-def copy_file(source: Path, dest: Path):
+def get_name_template(tmpl_path: Path) -> Optional[Template]:
+    """Get the compiled filename template of a template file.
+
+    Args:
+        tmpl_path (Path): The path to the template file.
+
+    Returns:
+        Optional[Template]: The shared compiled template, or None if the file stem
+        contains no template syntax and is used as the filename as is.
+    """
+    stem = tmpl_path.stem
+    if "{" not in stem:
+        return None
+    return jinja._compiled_name_template(stem)
+
+
+def compute_output_path(
+    tmpl_path: Path, schemas: dict, output_dir: Path, name_tmpl: Optional[Template]
+) -> Path:
+    """Compute the output file path of a template.
+
+    Args:
+        tmpl_path (Path): The path to the template file.
+        schemas (dict): The data used to render the filename.
+        output_dir (Path): The output directory of the template.
+        name_tmpl (Optional[Template]): The filename template from `get_name_template`.
+
+    Returns:
+        Path: The path to the output file.
+    """
+    if name_tmpl is None:
+        return output_dir / tmpl_path.stem
+    return output_dir / name_tmpl.render(schemas)
+
+
+def copy_file(source: Path, dest: Path, created_dirs: Optional[set] = None):
     """Copy a file from the source path to the destination path.
 
     Args:
         source (Path): The path to the source file.
         dest (Path): The path to the destination file.
+        created_dirs (Optional[set]): The output directories already created, see
+            `process_directory`.
     """
     if source == dest:
         return
-    dest.parent.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(dest.parent, created_dirs)
     shutil.copy(source, dest)
 
 
+def report_skipped(skipped: List[Path], output: Path):
+    """Report the output files that were left untouched because they already exist.
+
+    Args:
+        skipped (List[Path]): The paths to the skipped output files.
+        output (Path): The output root directory.
+    """
+    for filepath in skipped:
+        click.secho(
+            f"The {filepath.relative_to(output)} file already exists and will be ignored.",
+            fg="yellow",
+        )
+
+
+def write_rendered(
+    tmpl: Template,
+    context: dict,
+    filepath: Path,
+    update: bool,
+    created_dirs: Optional[set] = None,
+) -> Optional[Path]:
+    """Render a template and write the result to the given file.
+
+    Existing files are left untouched unless `update` is set, in which case they are
+    only rewritten when the rendered content differs.
+
+    Args:
+        tmpl (Template): The compiled template to render.
+        context (dict): The data used in the template rendering.
+        filepath (Path): The path to the output file.
+        update (bool): Whether existing files should be updated.
+        created_dirs (Optional[set]): The output directories already created, see
+            `process_directory`.
+
+    Returns:
+        Optional[Path]: The file path if it already exists and was skipped, else None.
+    """
+    if not update:
+        _ensure_dir(filepath.parent, created_dirs)
+        # Creating the file exclusively checks for an existing one in the same call
+        try:
+            file = filepath.open("x")
+        except FileExistsError:
+            return filepath
+        try:
+            with file:
+                file.write(tmpl.render(**context))
+        except BaseException:
+            filepath.unlink(missing_ok=True)
+            raise
+        return None
+
+    content = tmpl.render(**context)
+
+    # Leave unchanged outputs untouched to keep their modification times
+    try:
+        if filepath.read_text() == content:
+            return None
+        exists = True
+    except FileNotFoundError:
+        exists = False
+    _ensure_dir(filepath.parent, created_dirs)
+    # Write next to the target and swap it in, so readers never see a partial file
+    tmp_path = filepath.with_name(filepath.name + ".tmp")
+    try:
+        tmp_path.write_text(content)
+        if exists:
+            # Keep the permissions of the replaced file, e.g. executable scripts
+            shutil.copymode(filepath, tmp_path)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return None
+
+
 def process_file(
     env: Environment,
     loader: FileSystemLoader,
     tmpl_path: Path,
     schemas: dict,
     output: Path,
-):
+    searchpath: Optional[Path] = None,
+    merged: bool = False,
+    created_dirs: Optional[set] = None,
+    report: bool = True,
+) -> List[Path]:
     """Process a single file template, render it with the provided schemas,
     and save the output to the designated directory.
 
@@ -71,31 +235,36 @@ def process_file(
         loader (FileSystemLoader): The Jinja2 loader.
         tmpl_path (Path): The path to the template file.
         schemas (dict): A dictionary containing data to be used in the template rendering.
-    """
-    schema, schema_path = load_associated_schema(tmpl_path)
-    schemas.update(schema)
+        searchpath (Optional[Path]): The loader search path, taken from the loader if omitted.
+        merged (bool): Whether `schemas` already holds the associated schema of the
+            template, see `merge_associated_schema`.
+        created_dirs (Optional[set]): The output directories already created, see
+            `process_directory`.
+        report (bool): Whether the skipped output files are reported right away, see
+            `report_skipped`. Callers turning this off report them themselves.
 
-    searchpath = loader.searchpath[0]
-    searchpath = Path(searchpath)
-    tmpl_fullname = tmpl_path.relative_to(searchpath)
-    tmpl = env.get_template(str(tmpl_fullname))
-    content = tmpl.render(**schemas)
+    Returns:
+        List[Path]: The output files skipped because they already exist.
+    """
+    if not merged:
+        schema, schema_path = load_associated_schema(tmpl_path)
+        schemas.update(schema)
 
+    if searchpath is None:
+        searchpath = Path(loader.searchpath[0])
     output_dir = get_output_dir(tmpl_path, searchpath, output)
 
-    tmpl_ = jinja.create_string_template(tmpl_path.stem)
-    filename = tmpl_.render(schemas)
-    filepath = output_dir / filename
-    filepath.parent.mkdir(parents=True, exist_ok=True)
+    name_tmpl = get_name_template(tmpl_path)
+    filepath = compute_output_path(tmpl_path, schemas, output_dir, name_tmpl)
 
+    tmpl_fullname = tmpl_path.relative_to(searchpath)
+    tmpl = env.get_template(str(tmpl_fullname))
     update = schemas.get("_update", False)
-    if filepath.is_file() and not update:
-        click.secho(
-            f"The {filepath.relative_to(output)} file already exists and will be ignored.",
-            fg="yellow",
-        )
-        return
-    filepath.write_text(content)
+    skipped_path = write_rendered(tmpl, schemas, filepath, update, created_dirs)
+    skipped = [skipped_path] if skipped_path else []
+    if report:
+        report_skipped(skipped, output)
+    return skipped
 
 
 def process_files(
@@ -104,39 +273,70 @@ def process_files(
     tmpl_path: Path,
     schemas: dict,
     output: Path,
-):
+    searchpath: Optional[Path] = None,
+    merged: bool = False,
+    created_dirs: Optional[set] = None,
+    report: bool = True,
+) -> List[Path]:
     """Process files with an iterator, rendering each element with the template and
     saving the outputs to the designated directory.
 
+    The associated schema, the compiled templates and the update flag are shared by
+    all elements; only the "_" variable changes between renders. The filtered list of
+    elements is available to the templates as "_items", so they need not apply the
+    "_iter_filter" filter again. Like "_", "_items" is reserved and overrides a schema
+    key of the same name.
+
     Args:
         env (Environment): The Jinja2 environment.
         loader (FileSystemLoader): The Jinja2 loader.
         tmpl_path (Path): The path to the template file.
         schemas (dict): A dictionary containing data to be used in the template rendering.
+        searchpath (Optional[Path]): The loader search path, taken from the loader if omitted.
+        merged (bool): Whether `schemas` already holds the associated schema of the
+            template, see `merge_associated_schema`.
+        created_dirs (Optional[set]): The output directories already created, see
+            `process_directory`.
+        report (bool): Whether the skipped output files are reported right away, see
+            `report_skipped`. Callers turning this off report them themselves.
+
+    Returns:
+        List[Path]: The output files skipped because they already exist.
     """
-    schema, schema_path = load_associated_schema(tmpl_path)
-    schemas.update(schema)
+    if not merged:
+        schema, schema_path = load_associated_schema(tmpl_path)
+        schemas.update(schema)
 
-    searchpath = loader.searchpath[0]
-    searchpath = Path(searchpath)
+    if searchpath is None:
+        searchpath = Path(loader.searchpath[0])
 
     output_dir = get_output_dir(tmpl_path, searchpath, output)
 
+    elements = []
     iter_key = schemas.get("_iter")
     if iter_key:
         elements = utils.retrieve_nested_value(schemas, iter_key) or []
         _iter_filter = schemas.get("_iter_filter")
         if _iter_filter and _iter_filter in env.filters:
             elements = env.filters[_iter_filter](elements)
+        elements = list(elements)
 
-    for elem in elements:
-        schemas_copy = {"_": elem, **schemas}
-        tmpl_ = jinja.create_string_template(tmpl_path.stem)
-        filename = tmpl_.render(schemas_copy)
-        filepath = output_dir / filename
-        filepath.parent.mkdir(parents=True, exist_ok=True)
+    name_tmpl = get_name_template(tmpl_path)
+    tmpl_fullname = tmpl_path.relative_to(searchpath)
+    tmpl = env.get_template(str(tmpl_fullname))
+    update = schemas.get("_update", False)
 
-        process_file(env, loader, tmpl_path, schemas_copy, output)
+    context = dict(schemas, _items=elements)
+    skipped = []
+    for elem in elements:
+        context["_"] = elem
+        filepath = compute_output_path(tmpl_path, context, output_dir, name_tmpl)
+        skipped_path = write_rendered(tmpl, context, filepath, update, created_dirs)
+        if skipped_path:
+            skipped.append(skipped_path)
+    if report:
+        report_skipped(skipped, output)
+    return skipped
 
 
 def merge_and_export_schemas(
@@ -159,8 +359,9 @@ def merge_and_export_schemas(
     schema_path = tmpl_root_dir / filename
 
     if schema_path.is_file():
-        # Load schema from the schema file
-        schema = recursive_resolve(schema_path.parent, schema_path)
+        # Load schema from the schema file, resolved once per call as the files it
+        # references may change between calls
+        schema = utils.intern_keys(recursive_resolve(schema_path.parent, schema_path))
 
         # Update schemas with the loaded schema
         schemas.update(schema)
@@ -168,36 +369,114 @@ def merge_and_export_schemas(
     return schemas
 
 
-def process_directory(tmpl_root_dir: Path, output: Path, schemas: dict = {}):
+def iter_template_files(dirpath: str) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Recursively iterate over the files of a template directory using `os.scandir`.
+
+    Files of a directory are yielded before descending into its subdirectories,
+    matching the top-down order of `os.walk`. Symbolic links to directories are
+    not followed.
+
+    Args:
+        dirpath (str): The path to the directory to scan.
+
+    Yields:
+        Tuple[str, os.DirEntry]: The containing directory path and the file entry.
+    """
+    subdirs = []
+    with os.scandir(dirpath) as it:
+        for entry in it:
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    subdirs.append(entry.path)
+            else:
+                yield dirpath, entry
+
+    for subdir in subdirs:
+        yield from iter_template_files(subdir)
+
+
+def process_directory(
+    tmpl_root_dir: Path,
+    output: Path,
+    schemas: dict = {},
+    copy_templates: bool = True,
+    jobs: Optional[int] = None,
+    jinja_cache: bool = True,
+):
     """Process a directory of templates, including single file templates,
     multi-file templates with iterators, and static files.
 
+    The directory is walked first; templates are then rendered and static files copied
+    by a pool of worker threads, as every task writes to its own output files.
+
     Args:
         tmpl_dir (Path): The path to the directory containing the template files.
         schemas (dict): A dictionary containing global data to be used across all templates.
+        copy_templates (bool): Whether the template sources (templates, schemas and
+            handlers.py) are copied to the output as well, which `update` relies on.
+        jobs (Optional[int]): The number of worker threads, defaults to
+            `min(32, 4 * os.cpu_count())`. With 1, everything runs in the calling thread.
+        jinja_cache (bool): Whether compiled templates are kept in the bytecode cache,
+            see `jinja.create_bytecode_cache`.
     """
-    env, loader = jinja.create_filesys_env(tmpl_root_dir)
+    env, loader = jinja.create_filesys_env(tmpl_root_dir, jinja_cache)
     schemas = merge_and_export_schemas(tmpl_root_dir, output, schemas)
     env.globals.update(schemas)
 
     handlers_py = tmpl_root_dir / "handlers.py"
     if handlers_py.is_file():
-        for name, filter_ in utils.load_jinja_filters(handlers_py):
-            env.filters[name] = filter_
-        for name, global_ in utils.load_jinja_globals(handlers_py):
-            env.globals[name] = global_
-
-    for root, _, files in os.walk(tmpl_root_dir):
-        root = Path(root)
-
-        for file in files:
-            file = root / file
-            if file.name == "types.schema":
-                pass
-            schemas_copy = copy.deepcopy(schemas)
-            if file.suffix == ".tpl":
-                process_file(env, loader, file, schemas_copy, output)
-            elif file.suffix == ".mtpl":
-                process_files(env, loader, file, schemas_copy, output)
-            dest = get_output_dir(file, tmpl_root_dir, output) / file.name
-            copy_file(file, dest)
+        filters, globals_ = utils.load_jinja_handlers(handlers_py)
+        env.filters.update(filters)
+        env.globals.update(globals_)
+
+    searchpath = Path(loader.searchpath[0])
+    tmpl_root_dir_str = str(tmpl_root_dir)
+    output_str = str(output)
+    # Output directories created by the tasks of this call. Each call has its own set,
+    # as the output tree may change between calls and calls may run concurrently
+    created_dirs = set()
+    tasks = []
+    for dirpath, entry in iter_template_files(tmpl_root_dir_str):
+        name = entry.name
+        file = Path(entry.path)
+        if name.endswith(".tpl") or name.endswith(".mtpl"):
+            func = process_file if name.endswith(".tpl") else process_files
+            tmpl_schemas = merge_associated_schema(schemas, file)
+            task = partial(
+                func,
+                env,
+                loader,
+                file,
+                tmpl_schemas,
+                output,
+                searchpath,
+                merged=True,
+                created_dirs=created_dirs,
+                report=False,
+            )
+            tasks.append(task)
+            is_source = True
+        else:
+            is_source = name.endswith(".schema") or (
+                name == "handlers.py" and dirpath == tmpl_root_dir_str
+            )
+        if is_source and not copy_templates:
+            continue
+        rel_dir = dirpath[len(tmpl_root_dir_str) :].lstrip(os.sep)
+        dest = Path(os.path.join(output_str, rel_dir, name))
+        tasks.append(partial(copy_file, file, dest, created_dirs))
+
+    if jobs is None:
+        jobs = min(32, (os.cpu_count() or 1) * 4)
+
+    if jobs <= 1:
+        results = [task() for task in tasks]
+    else:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(task) for task in tasks]
+            # Collected in submission order, so messages keep the walk order
+            results = [future.result() for future in futures]
+
+    for skipped in results:
+        if skipped:
+            report_skipped(skipped, output)
@@ -1,14 +1,48 @@
 """Jinja2 Utility Functions"""
 
+import hashlib
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 from jinja2.environment import Environment
 from jinja2.loaders import FileSystemLoader
+from jinja2.bccache import FileSystemBytecodeCache
 from jinja2 import Template
 from case_convert import snake_case, camel_case, pascal_case
+from codectl import settings
 
+CASE_FILTERS = {
+    "snake_case": snake_case,
+    "camel_case": camel_case,
+    "pascal_case": pascal_case,
+}
 
-def create_filesys_env(searchpath: Path) -> Tuple[Environment, FileSystemLoader]:
+_STRING_ENV = Environment()
+_STRING_ENV.filters.update(CASE_FILTERS)
+
+
+def create_bytecode_cache(searchpath: Path) -> FileSystemBytecodeCache:
+    """Creates a bytecode cache for the templates under a search path.
+
+    Compiled templates are stored in a subdirectory of `settings.JINJA_CACHE_DIR` named
+    after the search path, so later runs skip parsing and compiling unchanged templates.
+
+    Args:
+        searchpath (Path): The directory path used to locate templates.
+
+    Returns:
+        The bytecode cache for the search path.
+    """
+
+    key = hashlib.sha1(str(Path(searchpath).resolve()).encode()).hexdigest()
+    directory = settings.JINJA_CACHE_DIR / key
+    directory.mkdir(parents=True, exist_ok=True)
+    return FileSystemBytecodeCache(directory=str(directory), pattern="%s.cache")
+
+
+def create_filesys_env(
+    searchpath: Path, bytecode_cache: bool = True
+) -> Tuple[Environment, FileSystemLoader]:
     """Sets up a Jinja2 Environment with custom filters and loop controls.
 
     Initializes a Jinja2 Environment for rendering templates, equipped with a
@@ -16,8 +50,13 @@ def create_filesys_env(searchpath: Path) -> Tuple[Environment, FileSystemLoader]
     and filters for string case conversion (snake_case, camel_case, pascal_case),
     enhancing template text manipulation capabilities.
 
+    A new Environment is created on every call, since callers register their own
+    globals and filters on it. Compiled templates are shared between calls and runs
+    by the bytecode cache, see `create_bytecode_cache`.
+
     Args:
         searchpath (Path): The directory path used to locate templates.
+        bytecode_cache (bool): Whether compiled templates are kept in the bytecode cache.
 
     Returns:
         A tuple containing the configured Jinja2 Environment and FileSystemLoader,
@@ -30,11 +69,10 @@ def create_filesys_env(searchpath: Path) -> Tuple[Environment, FileSystemLoader]
     """
 
     loader = FileSystemLoader(searchpath)
-    env = Environment(loader=loader)
+    cache = create_bytecode_cache(searchpath) if bytecode_cache else None
+    env = Environment(loader=loader, bytecode_cache=cache)
     env.add_extension("jinja2.ext.loopcontrols")
-    env.filters["snake_case"] = snake_case
-    env.filters["camel_case"] = camel_case
-    env.filters["pascal_case"] = pascal_case
+    env.filters.update(CASE_FILTERS)
     return env, loader
 
 
@@ -42,10 +80,11 @@ def create_string_template(source: str) -> Template:
     """
     Creates a Jinja2 Template object from a string source.
 
-    This function instantiates a Jinja2 Environment without a specific loader and
-    uses it to create a Template object directly from the provided string source.
+    This function uses a shared Jinja2 Environment without a specific loader to
+    create a Template object directly from the provided string source.
     This is useful for cases where template content is dynamically defined or
-    obtained from non-file sources.
+    obtained from non-file sources. The case conversion filters are available,
+    so filename templates may use them as well.
 
     Args:
         source (str): The string containing the Jinja2 template code.
@@ -59,5 +98,19 @@ def create_string_template(source: str) -> Template:
         Hello, World!
     """
 
-    env = Environment()
-    return env.from_string(source)
+    return _STRING_ENV.from_string(source)
+
+
+@lru_cache(maxsize=None)
+def _compiled_name_template(stem: str) -> Template:
+    """Returns the compiled filename template for a template stem, compiling it only
+    on first use.
+
+    Args:
+        stem (str): The template file stem, e.g. "{{_.name}}.ts".
+
+    Returns:
+        The cached Jinja2 Template object for the stem.
+    """
+
+    return create_string_template(stem)
@@ -0,0 +1,46 @@
+"""JSON reading and writing, using `orjson` when it is installed."""
+
+from pathlib import Path
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def load_json(path: Path) -> Any:
+    """
+    Load a JSON file, parsing it with `orjson` when it is installed.
+
+    Args:
+        path (Path): The path to the JSON file.
+
+    Returns:
+        The parsed JSON document.
+    """
+
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    return json.loads(path.read_text())
+
+
+def dump_json(data: Any) -> str:
+    """
+    Serialize data to an indented JSON string, using `orjson` when it is installed.
+
+    Non-ASCII characters are written as is.
+
+    Args:
+        data (Any): The data to serialize.
+
+    Returns:
+        str: The JSON document.
+    """
+
+    if orjson is not None:
+        return orjson.dumps(
+            data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(data, indent=2, ensure_ascii=False)
@@ -4,10 +4,50 @@ from pathlib import Path
 import json
 from typing import Union, Optional, Tuple
 import click
-from codectl import compiler, settings
+from codectl import compiler, jsonio, settings
 from codectl import utils
 
 
+def parse_key_value(item: str, param_hint: str) -> Tuple[str, str]:
+    """
+    Split a command-line item formatted as key=value.
+
+    Only the first "=" separates the key, so values may contain "=" themselves.
+
+    Args:
+        item (str): The item to split.
+        param_hint (str): The option name used in the error message.
+
+    Returns:
+        Tuple[str, str]: The key and the value.
+
+    Raises:
+        click.BadParameter: If the item contains no "=".
+    """
+    key, sep, value = item.partition("=")
+    if not sep:
+        raise click.BadParameter(
+            f"'{item}' is not formatted as key=value.", param_hint=param_hint
+        )
+    return key, value
+
+
+def is_jinja_cache_enabled(user_config: dict) -> bool:
+    """
+    Tell whether compiled templates are cached, see `jinja.create_bytecode_cache`.
+
+    The cache is enabled by default and turned off with
+    `codectl config --set -i jinja_cache=off`.
+
+    Args:
+        user_config (dict): The user configuration.
+
+    Returns:
+        bool: False if the cache is turned off, else True.
+    """
+    return user_config.get("jinja_cache", "on") != "off"
+
+
 @click.group()
 def cli():
     """
@@ -50,6 +90,8 @@ def config(set: bool, show: bool, items: Tuple[str]):
     Examples:
         - codectl config --set -i template_dir=~/.codectl/templates
 
+        - codectl config --set -i jinja_cache=off # Disable the compiled template cache
+
         - codectl config --show # Display the current configuration:  
 
     Note:
@@ -60,12 +102,10 @@ def config(set: bool, show: bool, items: Tuple[str]):
 
     if set:
         for item in items:
-            key, value = item.split("=")
+            key, value = parse_key_value(item, "'--items' / '-i'")
             user_config[key] = value
 
-        settings.CONFIG_PATH.write_text(
-            json.dumps(user_config, indent=2, ensure_ascii=False)
-        )
+        settings.CONFIG_PATH.write_text(jsonio.dump_json(user_config))
 
         if not show:
             click.secho("Configuration updated successfully.", fg="green")
@@ -89,7 +129,20 @@ def config(set: bool, show: bool, items: Tuple[str]):
     type=str,
     help="Key-value pairs for template data substitution, formatted as key=value. For example, 'author=Jane Doe'. Multiple -d options can be specified.",
 )
-def new(app: str, output: str | Path, data: tuple):
+@click.option(
+    "--copy-templates/--no-copy-templates",
+    default=True,
+    help="Copy the template sources (templates, schemas and handlers.py) into the new application instance. They are required by the update command. Enabled by default.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Number of worker threads used to render and copy files. Defaults to four per CPU, at most 32. Use 1 to process files sequentially, e.g. for debugging.",
+)
+def new(
+    app: str, output: str | Path, data: tuple, copy_templates: bool, jobs: Optional[int]
+):
     """
     Creates a new application instance from a specified template.
 
@@ -99,11 +152,15 @@ def new(app: str, output: str | Path, data: tuple):
         app (str): The name of the application template to use. This name should match a directory within the configured template directory.
         output (str | Path): The path to the directory where the new application instance will be created. If omitted, the current working directory is used.
         data (tuple): A collection of key-value pairs (as strings) to be used for data substitution in the template. Each pair should be formatted as 'key=value'.
+        copy_templates (bool): If True, the template sources are copied into the new application instance so it can be refreshed with the update command.
+        jobs (Optional[int]): The number of worker threads. Defaults to four per CPU, at most 32.
 
     Examples:
 
         - codectl new myapp --output ~/projects/myapp -d name=MyApp
 
+        - codectl new myapp --no-copy-templates # Only emit the generated files
+
     Note:
         Before using this command, ensure that the template directory is configured correctly with `codectl config --set template_dir=<path>`.
     """
@@ -127,8 +184,15 @@ def new(app: str, output: str | Path, data: tuple):
         )
         return
 
-    schemas = dict((item.split("=") for item in data))
-    compiler.process_directory(app_template_dir, output=output, schemas=schemas)
+    schemas = dict(parse_key_value(item, "'--data' / '-d'") for item in data)
+    compiler.process_directory(
+        app_template_dir,
+        output=output,
+        schemas=schemas,
+        copy_templates=copy_templates,
+        jobs=jobs,
+        jinja_cache=is_jinja_cache_enabled(user_config),
+    )
     click.secho("Application instance created successfully.", fg="green")
 
 
@@ -141,7 +205,13 @@ def new(app: str, output: str | Path, data: tuple):
     type=str,
     help="Key-value pairs for data substitution within the specified directory, formatted as key=value. For example, 'title=New Title'. Multiple -d options can be specified for different substitutions.",
 )
-def update(directory: Path, data: tuple):
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Number of worker threads used to render and copy files. Defaults to four per CPU, at most 32. Use 1 to process files sequentially, e.g. for debugging.",
+)
+def update(directory: Path, data: tuple, jobs: Optional[int]):
     """
     Updates files in the specified directory based on the provided key-value pairs.
 
@@ -150,14 +220,21 @@ def update(directory: Path, data: tuple):
     Args:
         directory (Path): The path to the directory containing the files to be updated. The directory must exist.
         data (tuple): A collection of key-value pairs (as strings) for data substitution. Each pair should be formatted as 'key=value'.
+        jobs (Optional[int]): The number of worker threads. Defaults to four per CPU, at most 32.
 
     Examples:
 
         - codectl update ~/projects/myapp -d version=2.0.0
     """
     directory = Path(directory)
-    schemas = dict(item.split("=") for item in data)
-    compiler.process_directory(directory, output=directory, schemas=schemas)
+    schemas = dict(parse_key_value(item, "'--data' / '-d'") for item in data)
+    compiler.process_directory(
+        directory,
+        output=directory,
+        schemas=schemas,
+        jobs=jobs,
+        jinja_cache=is_jinja_cache_enabled(utils.get_user_config()),
+    )
     click.secho("Files have been updated successfully.", fg="green")
 
 
@@ -1,8 +1,10 @@
-import json
+import copy
+from urllib.parse import urljoin
 from jsonschema import RefResolver
 from pathlib import Path
-from typing import Union
+from typing import Dict, Optional, Set, Tuple, Union
 from deepmerge import always_merger
+from codectl.jsonio import load_json
 
 
 def recursive_resolve(base_uri: Union[str, Path], schema_file: Path) -> dict:
@@ -24,7 +26,7 @@ def recursive_resolve(base_uri: Union[str, Path], schema_file: Path) -> dict:
         base_uri = f"file://{base_uri.resolve()}"
 
     # Read the JSON Schema file
-    schema = json.loads(schema_file.read_text())
+    schema = load_json(schema_file)
 
     # Create a resolver for resolving references
     resolver = RefResolver(base_uri, schema)
@@ -35,38 +37,99 @@ def recursive_resolve(base_uri: Union[str, Path], schema_file: Path) -> dict:
     return schema
 
 
-def resolve_all_refs(base_uri: str, schema: dict, resolver: RefResolver):
+def resolve_all_refs(
+    base_uri: str,
+    schema: dict,
+    resolver: RefResolver,
+    resolved_cache: Optional[dict] = None,
+    visiting: Optional[Set[str]] = None,
+    ref_urls: Optional[Dict[Tuple[str, str], str]] = None,
+):
     """Recursively resolves all references in a JSON Schema and merges them into the schema object.
 
+    References are resolved relative to `base_uri` with the single given resolver, except
+    fragment-only references ("#/..."), which point into the document containing them.
+    Each referenced URI is resolved once; every occurrence merges a copy of the result,
+    later ones without parsing the reference again. References that point back to a URI
+    still being resolved are cyclic and are left in place.
+
     Args:
         base_uri (str): The base URI of the JSON Schema for resolving relative paths.
         schema (dict): The JSON Schema object to resolve references.
         resolver (RefResolver): The resolver object for resolving references.
+        resolved_cache (Optional[dict]): Fully resolved schemas keyed by reference URI.
+        visiting (Optional[Set[str]]): Reference URIs currently being resolved.
+        ref_urls (Optional[Dict[Tuple[str, str], str]]): Resolved URIs keyed by the
+            resolution scope and the raw "$ref" value.
     """
+    if resolved_cache is None:
+        resolved_cache = {}
+    if visiting is None:
+        visiting = set()
+    if ref_urls is None:
+        ref_urls = {}
+
+    def _resolve_ref(ref: str) -> Optional[dict]:
+        # The raw value maps to one URI within a resolution scope
+        key = (resolver.resolution_scope, ref)
+        url = ref_urls.get(key)
+        if url in resolved_cache:
+            return copy.deepcopy(resolved_cache[url])
+
+        if not ref.startswith("#"):
+            ref = urljoin(base_uri, ref)
+        url, resolved = resolver.resolve(ref)
+        ref_urls[key] = url
+        if url in resolved_cache:
+            return copy.deepcopy(resolved_cache[url])
+        if url in visiting:
+            return None
+
+        visiting.add(url)
+        # Fragment-only references in the resolved schema point into its own document
+        resolver.push_scope(url)
+        try:
+            # Recursively resolve the resolved schema
+            resolve_all_refs(
+                base_uri, resolved, resolver, resolved_cache, visiting, ref_urls
+            )
+        finally:
+            resolver.pop_scope()
+            visiting.discard(url)
+        resolved_cache[url] = copy.deepcopy(resolved)
+        # The resolved schema may contain the referencing object itself, e.g. a
+        # recursive definition, so merging it in place would create a cycle
+        return copy.deepcopy(resolved)
+
+    # Collect the objects holding a reference, each container is visited only once
+    ref_nodes = []
+    seen = set()
+    stack = [schema]
+    while stack:
+        node = stack.pop()
+        node_type = type(node)
+        if node_type is not dict and node_type is not list:
+            continue
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if node_type is dict:
+            if "$ref" in node:
+                ref_nodes.append(node)
+            stack.extend(node.values())
+        else:
+            stack.extend(node)
 
-    def _resolve_refs(subschema):
-        if isinstance(subschema, dict):
-            if "$ref" in subschema:
-                # Resolve the reference
-                with resolver.resolving(subschema["$ref"]) as resolved:
-                    # Recursively resolve the resolved schema
-                    resolve_all_refs(
-                        base_uri, resolved, RefResolver(base_uri, resolved)
-                    )
-                    # Merge the resolved schema into the current schema
-                    subschema = always_merger.merge(subschema, resolved)
-                # Remove the $ref key from the schema
-                if isinstance(subschema, dict):
-                    subschema.pop("$ref")
-            # Recursively resolve references in nested objects
-            if isinstance(subschema, list):
-                _resolve_refs(subschema)
-            else:
-                for value in subschema.values():
-                    _resolve_refs(value)
-        elif isinstance(subschema, list):
-            # Recursively resolve references in lists
-            for item in subschema:
-                _resolve_refs(item)
-
-    _resolve_refs(schema)
+    # Nested objects come after their parents, so resolve them first;
+    # the merged schemas are already resolved and need no further walk
+    for node in reversed(ref_nodes):
+        # The reference may have been resolved already while resolving another one
+        if "$ref" not in node:
+            continue
+        resolved = _resolve_ref(node["$ref"])
+        # Cyclic references are kept as they are
+        if resolved is not None:
+            # Merge the resolved schema into the current schema
+            always_merger.merge(node, resolved)
+            # Remove the $ref key from the schema
+            node.pop("$ref")
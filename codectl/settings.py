@@ -6,4 +6,6 @@ BASE_DIR = Path.home() / ".codectl"
 
 CONFIG_PATH = BASE_DIR / "config.json"
 
+JINJA_CACHE_DIR = BASE_DIR / "jinja_cache"
+
 CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
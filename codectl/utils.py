@@ -1,12 +1,14 @@
 from pathlib import Path
 import sys
-import inspect
-import importlib
-import json
-from typing import Iterable, Callable, Tuple
-from functools import reduce
-from operator import getitem
+import importlib.util
+import warnings
+from functools import lru_cache
+from typing import Any, Iterable, Callable, List, Tuple
 from codectl import settings
+from codectl.jsonio import load_json
+
+# Split key paths of `retrieve_nested_value`, keyed by the dotted path
+_key_path_parts = {}
 
 
 def retrieve_nested_value(dictionary: dict, key_path: str):
@@ -27,7 +29,47 @@ def retrieve_nested_value(dictionary: dict, key_path: str):
         42
     """
 
-    return reduce(getitem, key_path.split("."), dictionary)
+    parts = _key_path_parts.get(key_path)
+    if parts is None:
+        parts = _key_path_parts[key_path] = key_path.split(".")
+    for part in parts:
+        dictionary = dictionary[part]
+    return dictionary
+
+
+def intern_keys(data: Any) -> Any:
+    """
+    Replace the string keys of all nested dictionaries with interned strings, in place.
+
+    Template variable lookups then mostly compare keys by identity. Containers shared
+    between several places, or reachable from themselves, are visited only once.
+
+    Args:
+        data (Any): The parsed JSON document.
+
+    Returns:
+        The same document, with interned keys.
+    """
+
+    seen = set()
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        node_type = type(node)
+        if node_type is not dict and node_type is not list:
+            continue
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if node_type is dict:
+            items = list(node.items())
+            node.clear()
+            for key, value in items:
+                node[sys.intern(key) if type(key) is str else key] = value
+                stack.append(value)
+        else:
+            stack.extend(node)
+    return data
 
 
 def get_user_config() -> dict:
@@ -49,9 +91,9 @@ def get_user_config() -> dict:
 
     config = {}
 
-    if settings.CONFIG_PATH.is_file():
-        config.update(json.loads(settings.CONFIG_PATH.read_text()))
-    else:
+    try:
+        config.update(load_json(settings.CONFIG_PATH))
+    except FileNotFoundError:
         settings.CONFIG_PATH.write_text("{}")
 
     return config
@@ -62,7 +104,9 @@ def load_priv_funcs_from_mod(module_path: Path) -> Iterable[Tuple[str, Callable]
     Load private functions from a Python module.
 
     Imports a module by file path and returns private functions (functions with names starting with "_").
-    Modifies `sys.path` if necessary for import.
+    The module is executed from its file location, with its directory temporarily on
+    `sys.path` so it can import sibling modules, and its members are cached until the
+    file is modified.
 
     Args:
         module_path (Path): The path to the Python module file.
@@ -76,18 +120,63 @@ def load_priv_funcs_from_mod(module_path: Path) -> Iterable[Tuple[str, Callable]
         ...     print(name, func)
     """
 
-    if module_path.parent not in sys.path:
-        sys.path.append(str(module_path.parent))
+    return _load_module_members(str(module_path), module_path.stat().st_mtime_ns)
+
 
-    module = importlib.import_module(module_path.stem)
+@lru_cache(maxsize=None)
+def _load_module_members(
+    module_path: str, mtime_ns: int
+) -> Tuple[Tuple[str, Callable], ...]:
+    """Import a module from its file path and list its members, cached by path and modification time."""
 
-    return inspect.getmembers(module)
+    spec = importlib.util.spec_from_file_location(Path(module_path).stem, module_path)
+    module = importlib.util.module_from_spec(spec)
+    module_dir = str(Path(module_path).parent)
+    sys.path.insert(0, module_dir)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(module_dir)
+
+    return tuple(vars(module).items())
+
+
+def load_jinja_handlers(
+    module_path: Path,
+) -> Tuple[List[Tuple[str, Callable]], List[Tuple[str, Any]]]:
+    """
+    Load Jinja2 filters and globals from a Python module in a single pass.
+
+    Filters are the members named "filter_*" and globals the members named "global_*".
+
+    Args:
+        module_path (Path): The path to the Python module containing the handlers.
+
+    Returns:
+        A tuple of the (name, filter) list and the (name, global) list.
+
+    Example:
+        >>> filters, globals_ = load_jinja_handlers(Path('/path/to/handlers.py'))
+        >>> for name, func in filters:
+        ...     print(name, func)
+    """
+
+    filters = []
+    globals_ = []
+    for name, value in load_priv_funcs_from_mod(module_path):
+        if name.startswith("filter_"):
+            filters.append((name, value))
+        elif name.startswith("global_"):
+            globals_.append((name, value))
+    return filters, globals_
 
 
 def load_jinja_filters(module_path: Path) -> Iterable[Tuple[str, Callable]]:
     """
     Load Jinja2 filter functions from a Python module.
 
+    Deprecated: use `load_jinja_handlers`, which loads filters and globals together.
+
     Args:
         module_path (Path): The path to the Python module containing filter functions.
 
@@ -100,14 +189,20 @@ def load_jinja_filters(module_path: Path) -> Iterable[Tuple[str, Callable]]:
         ...     print(name, func)
     """
 
-    members = load_priv_funcs_from_mod(module_path)
-    return (mem for mem in members if mem[0].startswith("filter_"))
+    warnings.warn(
+        "load_jinja_filters is deprecated, use load_jinja_handlers instead.",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    return load_jinja_handlers(module_path)[0]
 
 
 def load_jinja_globals(module_path: Path) -> Iterable[Tuple[str, Callable]]:
     """
     Load Jinja2 global functions from a Python module.
 
+    Deprecated: use `load_jinja_handlers`, which loads filters and globals together.
+
     Args:
         module_path (Path): The path to the Python module containing global functions.
 
@@ -120,5 +215,9 @@ def load_jinja_globals(module_path: Path) -> Iterable[Tuple[str, Callable]]:
         ...     print(name, func)
     """
 
-    members = load_priv_funcs_from_mod(module_path)
-    return (mem for mem in members if mem[0].startswith("global_"))
+    warnings.warn(
+        "load_jinja_globals is deprecated, use load_jinja_handlers instead.",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    return load_jinja_handlers(module_path)[1]
@@ -1,11 +1,11 @@
-from operator import itemgetter
-
 global_version = "v1.1.0"
 
+API_VERSION = "1.0.0"
+
 
 def filter_upper(value: str):
     return value.upper()
 
 
 def filter_apis(value):
-    return filter(lambda x: itemgetter("version")(x) == "1.0.0", value)
+    return [x for x in value if x.get("version") == API_VERSION]
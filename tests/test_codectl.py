@@ -1,7 +1,11 @@
 import subprocess
+import os
+import hashlib
 from pathlib import Path
 import json
 import shutil
+import pytest
+from codectl import compiler, jinja, settings
 
 
 manage_py = (Path("codectl") / "manage.py").resolve()
@@ -23,6 +27,33 @@ def set_template_dir():
     )
 
 
+def run_new_apps(output, *args):
+    return [
+        subprocess.run(
+            ["python", manage_py, "new", app, "-o", output, *args],
+            capture_output=True,
+            text=True,
+            cwd=output.parent,
+        ).stdout
+        for app in ("a", "a", "b")
+    ]
+
+
+def read_tree(directory):
+    return {
+        path.relative_to(directory): path.read_bytes()
+        for path in directory.rglob("*")
+        if path.is_file()
+    }
+
+
+@pytest.fixture
+def isolated_settings(monkeypatch, tmp_path):
+    """Keep the configuration and the Jinja cache of in-process calls in tmp_path."""
+    monkeypatch.setattr(settings, "CONFIG_PATH", tmp_path / "config.json")
+    monkeypatch.setattr(settings, "JINJA_CACHE_DIR", tmp_path / "jinja_cache")
+
+
 def test_config(monkeypatch, tmp_path):
     monkeypatch.setenv("HOME", str(tmp_path))
     result = subprocess.run(
@@ -149,3 +180,194 @@ def test_update(monkeypatch, tmp_path):
         and lines[2] == "Files have been updated successfully."
     )
 
+
+def test_config_items_with_equals(monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    result = subprocess.run(
+        ["python", manage_py, "config", "--set", "-i", "url=https://a.b/?x=1"],
+        capture_output=True,
+        text=True,
+    )
+    assert (
+        result.stdout.strip() == "Configuration updated successfully."
+        and not result.stderr
+    )
+
+    result = subprocess.run(
+        ["python", manage_py, "config", "--show"], capture_output=True, text=True
+    )
+    assert json.loads(result.stdout) == {"url": "https://a.b/?x=1"}
+
+    result = subprocess.run(
+        ["python", manage_py, "config", "--set", "-i", "url"],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode != 0 and "is not formatted as key=value" in result.stderr
+
+
+def test_process_directory_isolates_calls(isolated_settings, tmp_path):
+    output = tmp_path / "out"
+
+    compiler.process_directory(Path("templates") / "a", output, {"system": "ubuntu"})
+    assert (output / "a.txt").read_text() == "V1.1.0\nubuntu"
+
+    compiler.process_directory(Path("templates") / "a", output, {})
+    assert (output / "a.txt").read_text() == "V1.1.0\n"
+
+
+def test_process_directory_recreates_removed_output(isolated_settings, tmp_path):
+    output = tmp_path / "out"
+
+    compiler.process_directory(Path("templates") / "b", output, {})
+    shutil.rmtree(output)
+    compiler.process_directory(Path("templates") / "b", output, {})
+
+    assert (output / "apis" / "login.ts").is_file()
+    assert (output / "types" / "user_login_request.ts").is_file()
+
+
+def test_process_directory_update_keeps_file_mode(isolated_settings, tmp_path):
+    output = tmp_path / "out"
+
+    compiler.process_directory(Path("templates") / "a", output, {"system": "centos"})
+    (output / "a.txt").chmod(0o755)
+    compiler.process_directory(Path("templates") / "a", output, {"system": "ubuntu"})
+
+    assert (output / "a.txt").read_text() == "V1.1.0\nubuntu"
+    assert (output / "a.txt").stat().st_mode & 0o777 == 0o755
+    assert not (output / "a.txt.tmp").exists()
+
+
+def test_process_file_reports_skipped_output(isolated_settings, tmp_path, capsys):
+    tmpl_dir = tmp_path / "tmpl"
+    tmpl_dir.mkdir()
+    tmpl_path = tmpl_dir / "x.txt.tpl"
+    tmpl_path.write_text("x")
+    env, loader = jinja.create_filesys_env(tmpl_dir)
+    output = tmp_path / "out"
+
+    assert compiler.process_file(env, loader, tmpl_path, {}, output) == []
+    assert compiler.process_file(env, loader, tmpl_path, {}, output) == [
+        output / "x.txt"
+    ]
+    assert capsys.readouterr().out == (
+        "The x.txt file already exists and will be ignored.\n"
+    )
+
+
+def test_process_directory_reloads_referenced_schemas(isolated_settings, tmp_path):
+    tmpl_dir = tmp_path / "tmpl"
+    tmpl_dir.mkdir()
+    (tmpl_dir / "schema.schema").write_text('{"$ref": "tmpl/names.json#/definitions"}')
+    (tmpl_dir / "name.txt.tpl").write_text("{{ name }}")
+
+    (tmpl_dir / "names.json").write_text('{"definitions": {"name": "first"}}')
+    compiler.process_directory(tmpl_dir, tmp_path / "out1", {})
+    (tmpl_dir / "names.json").write_text('{"definitions": {"name": "second"}}')
+    compiler.process_directory(tmpl_dir, tmp_path / "out2", {})
+
+    assert (tmp_path / "out1" / "name.txt").read_text() == "first"
+    assert (tmp_path / "out2" / "name.txt").read_text() == "second"
+
+
+def test_process_directory_jinja_cache_per_searchpath(isolated_settings, tmp_path):
+    for app in ("a", "b"):
+        compiler.process_directory(Path("templates") / app, tmp_path / app, {})
+
+    cache_dirs = list((tmp_path / "jinja_cache").iterdir())
+    assert sorted(path.name for path in cache_dirs) == sorted(
+        hashlib.sha1(str((Path("templates") / app).resolve()).encode()).hexdigest()
+        for app in ("a", "b")
+    )
+    assert all(any(path.glob("*.cache")) for path in cache_dirs)
+
+
+def test_new_jinja_cache_off(monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    set_template_dir()
+    shutil.copytree(Path("templates"), Path.home() / template_dir)
+    jinja_cache_dir = tmp_path / ".codectl" / "jinja_cache"
+
+    subprocess.run(["python", manage_py, "config", "--set", "-i", "jinja_cache=off"])
+    subprocess.run(["python", manage_py, "new", "a", "-o", "off"], cwd=tmp_path)
+    assert (tmp_path / "off" / "a.txt").is_file()
+    assert not jinja_cache_dir.exists()
+
+    subprocess.run(["python", manage_py, "config", "--set", "-i", "jinja_cache=on"])
+    subprocess.run(["python", manage_py, "new", "a", "-o", "on"], cwd=tmp_path)
+    assert any(jinja_cache_dir.iterdir())
+    assert read_tree(tmp_path / "off") == read_tree(tmp_path / "on")
+
+
+def test_new_jobs(monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    set_template_dir()
+    shutil.copytree(Path("templates"), Path.home() / template_dir)
+
+    sequential_stdouts = run_new_apps(tmp_path / "sequential", "-j", "1")
+    parallel_stdouts = run_new_apps(tmp_path / "parallel")
+
+    assert sequential_stdouts == parallel_stdouts
+    lines = sequential_stdouts[1].splitlines()
+    assert sorted(lines[:2]) == [
+        "The a1/a1.txt file already exists and will be ignored.",
+        "The a2/a2.txt file already exists and will be ignored.",
+    ] and lines[2:] == ["Application instance created successfully."]
+    assert read_tree(tmp_path / "sequential") == read_tree(tmp_path / "parallel")
+
+
+def test_new_no_copy_templates(monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    set_template_dir()
+    shutil.copytree(Path("templates"), Path.home() / template_dir)
+
+    output = tmp_path / "out"
+    for app in ("a", "b"):
+        result = subprocess.run(
+            ["python", manage_py, "new", app, "-o", output, "--no-copy-templates"],
+            capture_output=True,
+            text=True,
+            cwd=tmp_path,
+        )
+        assert (
+            result.stdout.strip() == "Application instance created successfully."
+            and not result.stderr
+        )
+
+    assert sorted(str(path) for path in read_tree(output)) == [
+        "a.txt",
+        "a1/a1.txt",
+        "a2/a2.txt",
+        "apis/login.ts",
+        "apis/logout.ts",
+        "types/user_login_request.ts",
+        "types/user_login_response.ts",
+    ]
+
+
+def test_update_keeps_unchanged_files(monkeypatch, tmp_path):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    set_template_dir()
+    shutil.copytree(Path("templates"), Path.home() / template_dir)
+
+    subprocess.run(
+        ["python", manage_py, "new", "a", "-o", "out"],
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+    )
+    a_txt = tmp_path / "out" / "a.txt"
+    os.utime(a_txt, ns=(1_000_000_000, 1_000_000_000))
+
+    result = subprocess.run(
+        ["python", manage_py, "update", tmp_path / "out"],
+        capture_output=True,
+        text=True,
+        cwd=tmp_path / "out",
+    )
+    assert (
+        result.stdout.splitlines()[-1] == "Files have been updated successfully."
+        and not result.stderr
+    )
+    assert a_txt.stat().st_mtime_ns == 1_000_000_000
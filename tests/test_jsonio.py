@@ -0,0 +1,39 @@
+import json
+import os
+import subprocess
+import pytest
+from codectl import jsonio
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(jsonio, "orjson", None)
+    return request.param
+
+
+def test_load_json(json_backend, tmp_path):
+    path = tmp_path / "a.json"
+    path.write_text('{"name": "名前", "items": [1, 2.5, null, true]}', encoding="utf-8")
+
+    assert jsonio.load_json(path) == {"name": "名前", "items": [1, 2.5, None, True]}
+
+
+def test_dump_json(json_backend):
+    data = {"name": "名前", "nested": {"items": [1, None], "empty": {}}}
+
+    assert jsonio.dump_json(data) == json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def test_import_does_not_create_settings_dir(tmp_path):
+    result = subprocess.run(
+        ["python", "-c", "import codectl.jsonio, codectl.schema"],
+        env={**os.environ, "HOME": str(tmp_path)},
+        capture_output=True,
+        text=True,
+    )
+
+    assert not result.stderr
+    assert not (tmp_path / ".codectl").exists()
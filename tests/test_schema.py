@@ -40,3 +40,108 @@ def test_resolve_schema(tmp_path):
         },
         "type": "object",
     }
+
+
+def test_resolve_schema_shared_and_cyclic_refs(tmp_path):
+    schema_a_path = tmp_path / "a.json"
+    schema_b_path = tmp_path / "b.json"
+
+    schema_dirname = tmp_path.name
+
+    schema_a = {
+        "properties": {
+            "creator": {"$ref": f"{schema_dirname}/b.json#/definitions/user"},
+            "owner": {"$ref": f"{schema_dirname}/b.json#/definitions/user"},
+        },
+    }
+    schema_b = {
+        "definitions": {
+            "user": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "parent": {"$ref": f"{schema_dirname}/b.json#/definitions/user"},
+                },
+            }
+        }
+    }
+    schema_a_path.write_text(json.dumps(schema_a))
+    schema_b_path.write_text(json.dumps(schema_b))
+
+    schema = recursive_resolve(tmp_path, schema_a_path)
+
+    user = {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "parent": {"$ref": f"{schema_dirname}/b.json#/definitions/user"},
+        },
+    }
+    assert schema == {"properties": {"creator": user, "owner": user}}
+    assert schema["properties"]["creator"] is not schema["properties"]["owner"]
+
+
+def test_resolve_schema_fragment_refs_in_referenced_document(tmp_path):
+    schema_a_path = tmp_path / "a.json"
+    schema_b_path = tmp_path / "b.json"
+
+    schema_dirname = tmp_path.name
+
+    schema_a = {
+        "properties": {"user": {"$ref": f"{schema_dirname}/b.json#/definitions/user"}},
+        "definitions": {"x": {"type": "A"}},
+    }
+    schema_b = {
+        "definitions": {
+            "user": {"properties": {"x": {"$ref": "#/definitions/x"}}},
+            "x": {"type": "B"},
+        }
+    }
+    schema_a_path.write_text(json.dumps(schema_a))
+    schema_b_path.write_text(json.dumps(schema_b))
+
+    schema = recursive_resolve(tmp_path, schema_a_path)
+
+    assert schema["properties"]["user"] == {"properties": {"x": {"type": "B"}}}
+
+
+def test_resolve_schema_chained_local_refs(tmp_path):
+    schema_a_path = tmp_path / "a.json"
+
+    schema_a = {
+        "properties": {"x": {"$ref": "#/definitions/a"}},
+        "definitions": {
+            "a": {"$ref": "#/definitions/b"},
+            "b": {"type": "string"},
+        },
+    }
+    schema_a_path.write_text(json.dumps(schema_a))
+
+    schema = recursive_resolve(tmp_path, schema_a_path)
+
+    assert schema["properties"] == {"x": {"type": "string"}}
+    assert schema["definitions"]["a"] == {"type": "string"}
+
+
+def test_resolve_schema_local_recursive_definition(tmp_path):
+    schema_a_path = tmp_path / "a.json"
+
+    node = {"properties": {"child": {"$ref": "#/definitions/node"}}}
+    schema_a_path.write_text(json.dumps({"definitions": {"node": node}}))
+
+    schema = recursive_resolve(tmp_path, schema_a_path)
+
+    # The recursive reference is inlined once and then kept, without aliasing
+    assert schema == {"definitions": {"node": {"properties": {"child": node}}}}
+    assert json.loads(json.dumps(schema)) == schema
+
+
+def test_resolve_schema_local_root_ref(tmp_path):
+    schema_a_path = tmp_path / "a.json"
+
+    schema_a_path.write_text(json.dumps({"a": {"$ref": "#"}}))
+
+    schema = recursive_resolve(tmp_path, schema_a_path)
+
+    assert schema == {"a": {"a": {"$ref": "#"}}}
+    assert json.loads(json.dumps(schema)) == schema
@@ -0,0 +1,34 @@
+import sys
+from codectl.utils import intern_keys, load_jinja_handlers
+
+
+def test_load_jinja_handlers_with_sibling_import(tmp_path):
+    (tmp_path / "codectl_test_helpers.py").write_text("PREFIX = 'v'\n")
+    handlers_py = tmp_path / "handlers.py"
+    handlers_py.write_text(
+        "from codectl_test_helpers import PREFIX\n"
+        "\n"
+        "global_version = PREFIX + '1.0.0'\n"
+        "\n"
+        "\n"
+        "def filter_upper(value):\n"
+        "    return value.upper()\n"
+    )
+
+    filters, globals_ = load_jinja_handlers(handlers_py)
+
+    assert [name for name, _ in filters] == ["filter_upper"]
+    assert globals_ == [("global_version", "v1.0.0")]
+    assert str(tmp_path) not in sys.path
+
+
+def test_intern_keys_shared_and_cyclic_containers():
+    shared = {"".join(["na", "me"]): "x"}
+    data = {"a": shared, "b": [shared, shared]}
+    data["self"] = data
+
+    assert intern_keys(data) is data
+
+    assert data["a"] is shared and data["b"] == [shared, shared]
+    assert data["self"] is data
+    assert next(iter(shared)) is sys.intern("name")